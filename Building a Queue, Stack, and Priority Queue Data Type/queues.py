@@ -7,7 +7,11 @@ class IterableMixin:
     def __len__(self):
         return len(self._elements)
 
+    # Iterating drains the elements by default; subclasses backed by a deque override it with a non-destructive iterator
     def __iter__(self):
+        return self.drain()
+
+    def drain(self):
         while len(self) > 0:
             yield self.dequeue()
 
@@ -15,6 +19,9 @@ class Queue(IterableMixin):
     def __init__(self, *elements):
         self._elements = deque(elements)
 
+    def __iter__(self):
+        return iter(self._elements)
+
     def enqueue(self, element):
         self._elements.append(element)
 
@@ -23,6 +30,9 @@ class Queue(IterableMixin):
         
 # Building a Stack Data Type
 class Stack(Queue): # Extending Queue class using inheritance
+    def __iter__(self): # Iterating from the top of the stack without popping
+        return reversed(self._elements)
+
     def dequeue(self): # Overriding the .dequeue method
         return self._elements.pop()
 
@@ -21,4 +21,12 @@ print("Initial length:",len(fifo))
 for element in fifo:
     print(element)
 
+print("Length after iterating:",len(fifo))
+
+# Testing 3
+# Draining the queue dequeues every element while iterating
+print("\nTesting 3:")
+for element in fifo.drain():
+    print(element)
+
 print("Final length:",len(fifo))
@@ -9,6 +9,9 @@ class IterableMixin:
         return len(self._elements)
 
     def __iter__(self):
+        return self.drain()
+
+    def drain(self):
         while len(self) > 0:
             yield self.dequeue()
 
@@ -16,6 +19,9 @@ class Queue(IterableMixin):
     def __init__(self, *elements):
         self._elements = deque(elements)
 
+    def __iter__(self):
+        return iter(self._elements)
+
     def enqueue(self, element):
         self._elements.append(element)
 
@@ -23,6 +29,9 @@ class Queue(IterableMixin):
         return self._elements.popleft()
         
 class Stack(Queue): 
+    def __iter__(self):
+        return reversed(self._elements)
+
     def dequeue(self): 
         return self._elements.pop()
 
@@ -1,113 +1,253 @@
 # Using multiprocessing.Queue for Interprocess Communication (IPC)
 
 # Necessary modules
+import os
 import time
+from itertools import islice
 from hashlib import md5
 from string import ascii_lowercase
 import multiprocessing
+from multiprocessing import shared_memory
 from dataclasses import dataclass
 import argparse
 import queue
+import threading
 import time
 
 # Killing a Worker with the Poison Pill
 POISON_PILL = None
 
+# Number of candidates a worker hashes between checks of the shared "found" flag
+CHECK_INTERVAL = 1024
+
+# Number of jobs per worker that each text length is split into, so that workers finishing early pick up the remaining ranges
+JOBS_PER_WORKER = 8
+
+# Texts up to this length are few enough to look up in a precomputed table instead of sending them to the workers
+LOOKUP_MAX_LENGTH = 2
+
+# Size in bytes of a raw MD5 digest
+DIGEST_SIZE = md5().digest_size
+
 # To minimize the cost of data serialization between your processes, each worker will produce its own chunk of letter combinations based on the range of indices specified in a dequeued job object
 class Combinations:
     def __init__(self, alphabet, length):
         self.alphabet = alphabet
         self.length = length
+        # Precompute the alphabet size, its encoded bytes, and the positional powers used by every index lookup
+        self._base = len(alphabet)
+        self._alphabet_bytes = alphabet.encode("utf-8")
+        self._powers = tuple(self._base ** i for i in reversed(range(length)))
 
     def __len__(self):
-        return len(self.alphabet) ** self.length
+        return self._base ** self.length
 
+    # Returns the combination as bytes, ready to be hashed without encoding it first
     def __getitem__(self, index):
         if index >= len(self):
             raise IndexError
-        return "".join(
-            self.alphabet[
-                (index // len(self.alphabet) ** i) % len(self.alphabet)
-            ]
-            for i in reversed(range(self.length))
-    )
+        return bytes(
+            self._alphabet_bytes[(index // power) % self._base]
+            for power in self._powers
+        )
+
+    # Walks the combinations from start_index to stop_index like an odometer, rewriting a single reusable buffer in place
+    # The yielded bytearray is only valid until the next iteration, so copy or decode it before moving on
+    def odometer(self, start_index, stop_index):
+        base, alphabet_bytes = self._base, self._alphabet_bytes
+        digits = [(start_index // power) % base for power in self._powers]
+        buffer = bytearray(alphabet_bytes[digit] for digit in digits)
+        for _ in range(start_index, stop_index):
+            yield buffer
+            position = self.length - 1
+            while position >= 0:
+                digits[position] += 1
+                if digits[position] < base:
+                    buffer[position] = alphabet_bytes[digits[position]]
+                    break
+                digits[position] = 0
+                buffer[position] = alphabet_bytes[0]
+                position -= 1
 
 # Job class that Python will serialize and place on the input queue for worker processes to consume
+# It only carries the text length and index range, so each worker rebuilds the matching Combinations from its own alphabet
 @dataclass(frozen=True)
 class Job:
-    combinations: Combinations
+    length: int
     start_index: int
     stop_index: int
 
-    def __call__(self, hash_value):
-        for index in range(self.start_index, self.stop_index):
-            text_bytes = self.combinations[index].encode("utf-8")
-            hashed = md5(text_bytes).hexdigest()
-            if hashed == hash_value:
-                return text_bytes.decode("utf-8")
+    # Gives up early once another worker has raised the shared found flag
+    def __call__(self, combinations, hash_bytes, found):
+        # Bind the hot loop's lookups to local names once per job
+        candidates = combinations.odometer(self.start_index, self.stop_index)
+        new_md5 = md5
+        for _ in range(self.start_index, self.stop_index, CHECK_INTERVAL):
+            if found.value:
+                return None
+            for text_bytes in islice(candidates, CHECK_INTERVAL):
+                if new_md5(text_bytes).digest() == hash_bytes:
+                    return text_bytes.decode("utf-8")
 
+# Each worker receives only the name of the shared memory block and reads the target digest and alphabet from it once it starts
 class Worker(multiprocessing.Process):
-    def __init__(self, queue_in, queue_out, hash_value):
+    def __init__(self, queue_in, queue_out, found, shared_name, alphabet_length, core=None):
         super().__init__(daemon=True)
         self.queue_in = queue_in
         self.queue_out = queue_out
-        self.hash_value = hash_value
+        self.found = found
+        self.shared_name = shared_name
+        self.alphabet_length = alphabet_length
+        self.core = core
+        # Filled in by attach() from the shared memory block once the worker process starts
+        self.hash_bytes = None
+        self.alphabet = None
+        self.combinations_by_length = {}
+
+    def attach(self):
+        shared = shared_memory.SharedMemory(name=self.shared_name)
+        try:
+            self.hash_bytes = bytes(shared.buf[:DIGEST_SIZE])
+            self.alphabet = bytes(
+                shared.buf[DIGEST_SIZE:DIGEST_SIZE + self.alphabet_length]
+            ).decode("utf-8")
+        finally:
+            shared.close()
 
     def run(self):
+        if self.core is not None:
+            os.sched_setaffinity(0, {self.core})
+        self.attach()
         while True:
             job = self.queue_in.get()
             if job is POISON_PILL:
                 self.queue_in.put(POISON_PILL)
                 break
-            if plaintext := job(self.hash_value):
+            if job.length not in self.combinations_by_length:
+                self.combinations_by_length[job.length] = Combinations(
+                    self.alphabet, job.length
+                )
+            combinations = self.combinations_by_length[job.length]
+            if plaintext := job(combinations, self.hash_bytes, self.found):
+                self.found.value = 1
                 self.queue_out.put(plaintext)
                 break
 
 # Defines a function that’ll try to reverse an MD5 hash value provided as the first argument
-def reverse_md5(hash_value, alphabet=ascii_lowercase, max_length=6):
+def reverse_md5(hash_bytes, alphabet=ascii_lowercase, max_length=6):
     for length in range(1, max_length + 1):
-        for combination in Combinations(alphabet, length):
-            text_bytes = "".join(combination).encode("utf-8")
-            hashed = md5(text_bytes).hexdigest()
-            if hashed == hash_value:
+        for text_bytes in Combinations(alphabet, length):
+            if md5(text_bytes).digest() == hash_bytes:
                 return text_bytes.decode("utf-8")
 
+# Maps the raw MD5 digest of every combination up to max_length back to its plaintext
+def lookup_table(alphabet, max_length):
+    return {
+        md5(text_bytes).digest(): text_bytes.decode("utf-8")
+        for length in range(1, max_length + 1)
+        for text_bytes in Combinations(alphabet, length)
+    }
+
+# Prints the solution along with the time elapsed since t1
+def report(solution, t1):
+    t2 = time.perf_counter()
+    print(f"{solution} (found in {t2 - t1:.1f}s)")
+
 def main(args):
     t1 = time.perf_counter()
 
-    queue_in = multiprocessing.Queue()
+    lookup_length = min(LOOKUP_MAX_LENGTH, args.max_length)
+    table = lookup_table(ascii_lowercase, lookup_length)
+    hash_bytes = args.hash_bytes
+    if solution := table.get(hash_bytes):
+        report(solution, t1)
+        return
+
+    # The shared memory block holds the raw target digest followed by the encoded alphabet
+    alphabet_bytes = ascii_lowercase.encode("utf-8")
+    shared = shared_memory.SharedMemory(
+        create=True, size=DIGEST_SIZE + len(alphabet_bytes)
+    )
+    shared.buf[:DIGEST_SIZE] = hash_bytes
+    shared.buf[DIGEST_SIZE:DIGEST_SIZE + len(alphabet_bytes)] = alphabet_bytes
+    try:
+        search(args, shared.name, len(alphabet_bytes), lookup_length, t1)
+    finally:
+        shared.close()
+        shared.unlink()
+
+# Spreads the remaining text lengths across the worker processes and waits for one of them to report the solution
+def search(args, shared_name, alphabet_length, lookup_length, t1):
+    # Workers only ever block on the input queue, so a SimpleQueue writing straight to the pipe avoids the feeder thread of a full Queue
+    # Its put() blocks while the pipe is full, so the jobs are enqueued from a helper thread to keep this loop watching the workers
+    queue_in = multiprocessing.SimpleQueue()
     queue_out = multiprocessing.Queue()
+    # Shared flag that lets the other workers stop hashing as soon as one of them finds the solution
+    found = multiprocessing.Value("i", 0, lock=False)
+
+    # Give each worker its own core among those this process may run on, where the platform supports pinning
+    if hasattr(os, "sched_setaffinity"):
+        cores = sorted(os.sched_getaffinity(0))
+    else:
+        cores = [None]
 
     workers = [
-        Worker(queue_in, queue_out, args.hash_value)
-        for _ in range(args.num_workers)
+        Worker(
+            queue_in,
+            queue_out,
+            found,
+            shared_name,
+            alphabet_length,
+            cores[i % len(cores)],
+        )
+        for i in range(args.num_workers)
     ]
 
     for worker in workers:
         worker.start()
 
-    for text_length in range(1, args.max_length + 1):
-        combinations = Combinations(ascii_lowercase, text_length)
-        for indices in chunk_indices(len(combinations), len(workers)):
-            queue_in.put(Job(combinations, *indices))
-
-    queue_in.put(POISON_PILL)
+    text_lengths = range(lookup_length + 1, args.max_length + 1)
+    num_jobs = len(workers) * JOBS_PER_WORKER
+    threading.Thread(
+        target=enqueue_jobs,
+        args=(queue_in, text_lengths, num_jobs),
+        daemon=True,
+    ).start()
 
     while any(worker.is_alive() for worker in workers):
         try:
             solution = queue_out.get(timeout=0.1)
             if solution:
-                t2 = time.perf_counter()
-                print(f"{solution} (found in {t2 - t1:.1f}s)")
+                report(solution, t1)
                 break
         except queue.Empty:
             pass
     else:
         print("Unable to find a solution")
 
+# Splits every text length into num_jobs ranges and puts them on the input queue, followed by the poison pill
+def enqueue_jobs(queue_in, text_lengths, num_jobs):
+    for text_length in text_lengths:
+        combinations = Combinations(ascii_lowercase, text_length)
+        for indices in chunk_indices(len(combinations), num_jobs):
+            queue_in.put(Job(text_length, *indices))
+    queue_in.put(POISON_PILL)
+
+# Converts the hex-encoded hash given on the command line into its raw digest bytes
+def md5_digest(hash_value):
+    try:
+        hash_bytes = bytes.fromhex(hash_value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"not a hex string: {hash_value!r}")
+    if len(hash_bytes) != DIGEST_SIZE:
+        raise argparse.ArgumentTypeError(
+            f"expected {DIGEST_SIZE * 2} hex digits, got {len(hash_value)}"
+        )
+    return hash_bytes
+
 def parse_args():
     parser = argparse.ArgumentParser()
-    parser.add_argument("hash_value")
+    parser.add_argument("hash_bytes", metavar="hash_value", type=md5_digest)
     parser.add_argument("-m", "--max-length", type=int, default=6)
     parser.add_argument(
         "-w",
@@ -120,13 +260,9 @@ def parse_args():
 # Distributing Workload Evenly in Chunks
 # Calculate indices of the subsequent chunks
 def chunk_indices(length, num_chunks):
-    start = 0
-    while num_chunks > 0:
-        num_chunks = min(num_chunks, length)
-        chunk_size = round(length / num_chunks)
-        yield start, (start := start + chunk_size)
-        length -= chunk_size
-        num_chunks -= 1
+    num_chunks = min(num_chunks, length)
+    for i in range(num_chunks):
+        yield i * length // num_chunks, (i + 1) * length // num_chunks
 
 if __name__ == "__main__":
     main(parse_args())
\ No newline at end of file
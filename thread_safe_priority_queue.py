@@ -6,12 +6,14 @@
 
 # Necessary modules
 import argparse
+import os
+from collections import deque
+from heapq import nsmallest
 from queue import LifoQueue, PriorityQueue, Queue
 import threading
-from random import randint
-from time import sleep
-from itertools import zip_longest
-from random import choice, randint
+from time import monotonic, sleep
+from itertools import islice, zip_longest
+from random import Random
 
 from rich.align import Align
 from rich.columns import Columns
@@ -30,6 +32,13 @@ QUEUE_TYPES = {
     "heap": PriorityQueue
 }
 
+# Number of random picks a worker draws at once and then consumes one by one
+RANDOM_BATCH_SIZE = 1000
+
+# Maximum number of queued products shown in the view, which is about as many as fit in the panel
+# The view shows the products closest to being taken out of the queue and counts the rest
+MAX_PREVIEW = 20
+
 # Defining the products that producers will pick at random and pretend to be working on
 PRODUCTS = (
     ":1st_place_medal:",
@@ -67,7 +76,20 @@ class Worker(threading.Thread):
         self.buffer = buffer
         self.product = None
         self.working = False
-        self.progress = 0
+        self._work_started = 0
+        self._duration = 1
+        # Each worker owns its random generator and keeps batches of pre-drawn delays
+        self._random = Random(os.urandom(8))
+        self._work_delays = deque()
+        self._idle_delays = deque()
+
+    @property
+    # The progress property works out the percentage of the current job from the time elapsed since it started
+    def progress(self):
+        if not self.working:
+            return 0
+        elapsed = monotonic() - self._work_started
+        return min(100, int(100 * elapsed / self._duration))
 
     @property
     # The state() function to check the state of a worker thread
@@ -77,34 +99,39 @@ class Worker(threading.Thread):
             return f"{self.product} ({self.progress}%)"
         return ":zzz: Idle"
 
+    # The draw() method returns the next pre-drawn pick from the pool, refilling it from the population in one batch when it runs out
+    def draw(self, pool, population):
+        if not pool:
+            pool.extend(self._random.choices(population, k=RANDOM_BATCH_SIZE))
+        return pool.popleft()
+
     # The simulate_idle() function to stimulate idle time
     #The simulate_idle() method resets the state of a worker thread and goes to sleep for a few randomly chosen seconds
     def simulate_idle(self):
         self.product = None
         self.working = False
-        self.progress = 0
-        sleep(randint(1,3))
+        sleep(self.draw(self._idle_delays, range(1, 4)))
     
     # The simulate_work() function to stimulate work time
-    # The simulate_work() picks a random delay in seconds adjusted to the worker’s speed and progresses through the work
+    # The simulate_work() picks a random delay in seconds adjusted to the worker’s speed and sleeps through the work in one go while the progress property tracks it
     def simulate_work(self):
+        delay = self.draw(self._work_delays, range(1, 2 + 15 // self.speed))
+        self._work_started = monotonic()
+        self._duration = delay
         self.working = True
-        self.progress = 0
-        delay = randint(1, 1 + 15 // self.speed)
-        for _ in range(100):
-            sleep(delay / 100)
-            self.progress += 1
+        sleep(delay)
 
 # The Producer class
 class Producer(Worker):
     def __init__(self, speed, buffer, products):
         super().__init__(speed, buffer)
         self.products = products
+        self._products = deque()
 
     # The run() method is where all the magic happens. A producer works in an infinite loop, choosing a random product and simulating some work before putting that product onto the queue, called a buffer. It then goes to sleep for a random period, and when it wakes up again, the process repeats
     def run(self):
         while True:
-            self.product = choice(self.products)
+            self.product = self.draw(self._products, self.products)
             self.simulate_work()
             self.buffer.put(self.product)
             self.simulate_idle
@@ -120,49 +147,79 @@ class Consumer(Worker):
             self.simulate_idle()
 
 # The View class that defines a view that renders the current state of your producers, consumers, and the queue ten times a second
+# It polls the workers and the queue on a fixed schedule rather than waiting to be notified of changes, and only redraws when the text on screen would change
 class View:
     def __init__(self, buffer, producers, consumers):
         self.buffer = buffer
         self.producers = producers
         self.consumers = consumers
-    
-    def animate(self):
-        with Live(self.render(), screen=True, refresh_per_second=10) as live:
-            while True:
-                live.update(self.render())
-
-    def render(self):
-        match self.buffer:
-            case PriorityQueue():
-                title = "Priority Queue"
-                products = map(str, reversed(list(self.buffer.queue)))
-            case LifoQueue():
-                title = "Stack"
-                products = list(self.buffer.queue)
-            case Queue():
-                title = "Queue"
-                products = reversed(list(self.buffer.queue))
-            case _:
-                title = products = ""
-
-        rows = [
-            Panel(f"[bold]{title}:[/] {', '.join(products)}", width=82)
-        ]
+        # Build the layout once and let update() only swap the text inside its panels
+        self._shown = None
+        self._worker_panels = []
+        self._queue_panel = Panel("", width=82)
+        rows = [self._queue_panel]
         pairs = zip_longest(self.producers, self.consumers)
         for i, (producer, consumer) in enumerate(pairs, 1):
             left_panel = self.panel(producer, f"Producer {i}")
             right_panel = self.panel(consumer, f"Consumer {i}")
             rows.append(Columns([left_panel, right_panel], width=40))
-        return Group(*rows)
+        self._layout = Group(*rows)
+    
+    def animate(self):
+        with Live(self.render(), screen=True, auto_refresh=False) as live:
+            while True:
+                deadline = monotonic() + 1 / 10
+                if self.update():
+                    live.refresh()
+                sleep(max(0, deadline - monotonic()))
+
+    def render(self):
+        self.update()
+        return self._layout
+
+    # The update() method refreshes the text inside the panels and reports whether any of it differs from what was last drawn
+    def update(self):
+        # Take a bounded snapshot of the next products to be consumed, in dequeue order, while holding the queue's lock
+        with self.buffer.mutex:
+            size = len(self.buffer.queue)
+            match self.buffer:
+                case PriorityQueue():
+                    title = "Priority Queue"
+                    upcoming = nsmallest(MAX_PREVIEW, self.buffer.queue)
+                case LifoQueue():
+                    title = "Stack"
+                    upcoming = list(islice(reversed(self.buffer.queue), MAX_PREVIEW))
+                case Queue():
+                    title = "Queue"
+                    upcoming = list(islice(self.buffer.queue, MAX_PREVIEW))
+                case _:
+                    title, upcoming = "", []
+
+        # The next product to be consumed is drawn rightmost, and any products left out are counted on the left
+        products = [str(product) for product in reversed(upcoming)]
+        if size > len(upcoming):
+            products.insert(0, f"… (+{size - len(upcoming)} more)")
+
+        texts = [f"[bold]{title}:[/] {', '.join(products)}"]
+        for worker, _ in self._worker_panels:
+            progress, state = worker.progress, worker.state
+            texts.append(" " * int(29 / 100 * progress) + state)
+        if texts == self._shown:
+            return False
+
+        self._shown = texts
+        self._queue_panel.renderable = texts[0]
+        for (_, panel), text in zip(self._worker_panels, texts[1:]):
+            panel.renderable.renderable = text
+        return True
 
     def panel(self, worker, title):
         if worker is None:
             return ""
-        padding = " " * int(29 / 100 * worker.progress)
-        align = Align(
-            padding + worker.state, align="left", vertical="middle"
-        )
-        return Panel(align, height=5, title=title)
+        align = Align("", align="left", vertical="middle")
+        panel = Panel(align, height=5, title=title)
+        self._worker_panels.append((worker, panel))
+        return panel
 
 # The main() function is the entry point, which receives the parsed arguments supplied by parse_args()
 def main(args):